@@ -1,24 +1,162 @@
 import argparse
+import csv
 import os
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 
 
+# Únicas colunas lidas do CSV de pacotes (o resto — Info, TLS, HTTP... — é ignorado)
+USED_COLUMNS = frozenset(
+    {
+        "frame.time_epoch",
+        "frame.len",
+        "ip.src",
+        "ip.dst",
+        "tcp.flags.syn",
+        "tcp.flags.ack",
+        "tcp.flags.reset",
+        "tcp.flags.rst",
+        "tcp.flags.fin",
+        "tcp.srcport",
+        "tcp.dstport",
+        "udp.srcport",
+        "udp.dstport",
+        "_ws.col.Protocol",
+        "frame.protocols",
+        "ip.proto",
+    }
+)
+
+
+# flag TCP -> prefixo da coluna agregada (syn_<label>, ack_<label>...)
+FLAG_MAP = {
+    "tcp.flags.syn": "syn",
+    "tcp.flags.ack": "ack",
+    "tcp.flags.reset": "reset",
+    "tcp.flags.rst": "rst",
+    "tcp.flags.fin": "fin",
+}
+FLAG_COLS = list(FLAG_MAP)
+PORT_COLS = ["tcp.srcport", "tcp.dstport", "udp.srcport", "udp.dstport"]
+
+# únicos marcadores de valor ausente, iguais em todos os leitores
+NULL_VALUES = ["", "NA"]
+
+
+def is_used_column(name: str) -> bool:
+    return name.strip() in USED_COLUMNS
+
+
+def read_header(path: str, sep: str, encoding: str = "utf-8") -> list[str]:
+    """Nomes das colunas (primeira linha) sem ler o resto do arquivo."""
+    if encoding == "utf-8":
+        encoding = "utf-8-sig"  # descarta BOM, como o read_csv
+    with open(path, encoding=encoding, newline="") as fh:
+        return next(csv.reader([fh.readline()], delimiter=sep))
+
+
 def guess_sep(path: str) -> str:
     """Chuta o separador a partir da extensão."""
     return "\t" if path.lower().endswith(".tsv") else ","
 
 
-def safe_int(x):
+def ip_codes(col: pd.Series) -> np.ndarray:
+    """Códigos inteiros (int64) de uma coluna de IPs; -1 para ausente."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col.cat.codes.to_numpy(np.int64)
+    return pd.factorize(col)[0].astype(np.int64)
+
+
+def entropy_by_bin(
+    df: pd.DataFrame, ip_col: str, win: np.ndarray, n_win: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Nº de IPs distintos e entropia (bits) de ip_col por janela compacta win."""
+    codes = ip_codes(df[ip_col])
+    ok = codes >= 0
+    # par (janela, ip) num int64; win compacto (0..n_win-1) não estoura o shift
+    packed = (win[ok].astype(np.int64) << 32) | (codes[ok] & 0xFFFFFFFF)
+    uniq, counts = np.unique(packed, return_counts=True)
+    win_of_uniq = uniq >> 32
+
+    n_uniq = np.bincount(win_of_uniq, minlength=n_win)
+    tot = np.bincount(win_of_uniq, weights=counts, minlength=n_win)
+    p = counts / tot[win_of_uniq]
+    H = np.bincount(win_of_uniq, weights=-p * np.log2(p), minlength=n_win)
+    return n_uniq, H
+
+
+def read_csv_arrow(
+    path: str,
+    sep: str,
+    usecols: list[str],
+    column_types: dict[str, str],
+    encoding: str = "utf-8",
+) -> pd.DataFrame | None:
+    """Lê usecols com pyarrow.csv (multithread); None sem pyarrow ou se falhar."""
     try:
-        return int(x)
-    except Exception:
-        return 0
+        import pyarrow as pa
+        import pyarrow.csv as pac
+    except ImportError:
+        return None
 
+    try:
+        table = pac.read_csv(
+            path,
+            read_options=pac.ReadOptions(block_size=64 << 20, encoding=encoding),
+            parse_options=pac.ParseOptions(delimiter=sep),
+            convert_options=pac.ConvertOptions(
+                column_types={c: pa.type_for_alias(t) for c, t in column_types.items()},
+                include_columns=usecols,
+                null_values=NULL_VALUES,
+                strings_can_be_null=True,
+            ),
+        )
+    except (pa.ArrowInvalid, UnicodeDecodeError):
+        return None  # ex.: UTF-16, UTF-8 inválido, valor fora do schema
+    return table.to_pandas()
+
+
+def read_packets_arrow(path: str, sep: str) -> pd.DataFrame | None:
+    """Lê com pyarrow.csv e schema tipado; None se não der."""
+    try:
+        header = read_header(path, sep)
+    except UnicodeDecodeError:
+        return None
 
-def shannon_entropy(series: pd.Series) -> float:
-    vc = series.value_counts(normalize=True, dropna=True)
-    return float((-vc * np.log2(vc)).sum()) if len(vc) else 0.0
+    # flags ficam como texto: a conversão (inválido -> 0) é feita em load_packets
+    types = {
+        **{c: "string" for c in USED_COLUMNS},
+        **{c: "int32" for c in PORT_COLS},
+        "frame.time_epoch": "float64",
+        "frame.len": "int32",
+    }
+    usecols = [c for c in header if is_used_column(c)]
+    # chaves com o nome cru do cabeçalho (ex. " tcp.flags.syn"): sem tipo, o
+    # Arrow inferiria bool para True/False e cada True contaria como 1
+    column_types = {c: types[c.strip()] for c in usecols}
+    return read_csv_arrow(path, sep, usecols, column_types)
+
+
+def read_packets_str(path: str, sep: str, encoding: str) -> pd.DataFrame:
+    """Lê as colunas usadas como texto; pyarrow.csv se disponível, senão C."""
+    usecols = [c for c in read_header(path, sep, encoding) if is_used_column(c)]
+    # schema só de strings explícito: engine="pyarrow" com dtype=str infere os
+    # tipos antes e só converte depois (célula vazia vira "None")
+    df = read_csv_arrow(
+        path, sep, usecols, {c: "string" for c in usecols}, encoding=encoding
+    )
+    if df is not None:
+        return df
+    return pd.read_csv(
+        path,
+        sep=sep,
+        dtype=str,
+        encoding=encoding,
+        usecols=usecols,
+        na_values=NULL_VALUES,
+        keep_default_na=False,
+    )
 
 
 def load_packets(path: str, sep: str | None = None) -> pd.DataFrame:
@@ -28,48 +166,44 @@ def load_packets(path: str, sep: str | None = None) -> pd.DataFrame:
     if sep is None:
         sep = guess_sep(path)
 
-    try:
-        df = pd.read_csv(path, sep=sep, dtype=str, encoding="utf-8")
-    except UnicodeDecodeError:
-        df = pd.read_csv(path, sep=sep, dtype=str, encoding="utf-16")
+    df = read_packets_arrow(path, sep)
+    if df is None:
+        try:
+            df = read_packets_str(path, sep, "utf-8")
+        except UnicodeDecodeError:
+            df = read_packets_str(path, sep, "utf-16")
 
     df.columns = [c.strip() for c in df.columns]
+    cols = set(df.columns)
 
     # Campos mínimos obrigatórios
     need = ["frame.time_epoch", "ip.src", "ip.dst", "frame.len"]
     for c in need:
-        if c not in df.columns:
+        if c not in cols:
             raise RuntimeError(f"Coluna ausente em {path}: {c}")
 
     # Flags TCP — aceitar diferentes nomes
-    syn = "tcp.flags.syn" if "tcp.flags.syn" in df.columns else None
-    ack = "tcp.flags.ack" if "tcp.flags.ack" in df.columns else None
+    syn = "tcp.flags.syn" if "tcp.flags.syn" in cols else None
+    ack = "tcp.flags.ack" if "tcp.flags.ack" in cols else None
     rst = (
         "tcp.flags.reset"
-        if "tcp.flags.reset" in df.columns
-        else ("tcp.flags.rst" if "tcp.flags.rst" in df.columns else None)
+        if "tcp.flags.reset" in cols
+        else ("tcp.flags.rst" if "tcp.flags.rst" in cols else None)
     )
-    fin = "tcp.flags.fin" if "tcp.flags.fin" in df.columns else None
+    fin = "tcp.flags.fin" if "tcp.flags.fin" in cols else None
 
     for col in [syn, ack, rst, fin]:
-        if col and col in df.columns:
-            df[col] = df[col].fillna(0).map(safe_int)
-
-    # Criar colunas de flags ausentes como 0 (para facilitar agregação)
-    for cname in [
-        "tcp.flags.syn",
-        "tcp.flags.ack",
-        "tcp.flags.reset",
-        "tcp.flags.rst",
-        "tcp.flags.fin",
-    ]:
-        if cname not in df.columns:
-            df[cname] = 0
-
-    # Portas: garantir colunas existem
-    for pcol in ["tcp.srcport", "tcp.dstport", "udp.srcport", "udp.dstport"]:
-        if pcol not in df.columns:
-            df[pcol] = np.nan
+        if col:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(np.int8)
+
+    # Criar colunas de flags ausentes como 0 e portas ausentes como NaN
+    # (para facilitar agregação), no próprio df, sem copiar o frame
+    for c in FLAG_COLS:
+        if c not in cols:
+            df[c] = np.int8(0)
+    for c in PORT_COLS:
+        if c not in cols:
+            df[c] = np.nan
 
     # Tipos numéricos
     df["frame.time_epoch"] = pd.to_numeric(df["frame.time_epoch"], errors="coerce")
@@ -83,44 +217,41 @@ def load_packets(path: str, sep: str | None = None) -> pd.DataFrame:
     # Descobrir melhor coluna de protocolo disponível
     proto_col = None
     for c in ["_ws.col.Protocol", "frame.protocols", "ip.proto"]:
-        if c in df.columns:
+        if c in cols:
             proto_col = c
             break
 
-    def infer_proto(row):
-        # 1) Se temos ip.proto (numérico)
-        if proto_col == "ip.proto":
-            try:
-                v = int(row[proto_col])
-            except Exception:
-                v = None
-            if v == 6:
-                return "TCP"
-            if v == 17:
-                return "UDP"
-            if v == 1:
-                return "ICMP"
-
-        # 2) Se temos string de protocolos (_ws.col.Protocol ou frame.protocols)
-        if proto_col in ["_ws.col.Protocol", "frame.protocols"] and isinstance(
-            row.get(proto_col, None), str
-        ):
-            up = row[proto_col].upper()
-            if "UDP" in up:
-                return "UDP"
-            if "TCP" in up:
-                return "TCP"
-            if "ICMP" in up:
-                return "ICMP"
-
-        # 3) Inferir pelas colunas de porta
-        if pd.notna(row.get("tcp.srcport")) or pd.notna(row.get("tcp.dstport")):
-            return "TCP"
-        if pd.notna(row.get("udp.srcport")) or pd.notna(row.get("udp.dstport")):
-            return "UDP"
-        return "OTHER"
-
-    df["proto"] = df.apply(infer_proto, axis=1)
+    conds: list[pd.Series] = []
+    choices: list[str] = []
+
+    # 1) Se temos ip.proto (numérico)
+    if proto_col == "ip.proto":
+        p = pd.to_numeric(df[proto_col], errors="coerce")
+        conds += [p == 6, p == 17, p == 1]
+        choices += ["TCP", "UDP", "ICMP"]
+
+    # 2) Se temos string de protocolos (_ws.col.Protocol ou frame.protocols)
+    if proto_col in ["_ws.col.Protocol", "frame.protocols"]:
+        up = df[proto_col].astype(str).str.upper()
+        conds += [
+            up.str.contains("UDP", regex=False),
+            up.str.contains("TCP", regex=False),
+            up.str.contains("ICMP", regex=False),
+        ]
+        choices += ["UDP", "TCP", "ICMP"]
+
+    # 3) Inferir pelas colunas de porta
+    conds += [
+        df["tcp.srcport"].notna() | df["tcp.dstport"].notna(),
+        df["udp.srcport"].notna() | df["udp.dstport"].notna(),
+    ]
+    choices += ["TCP", "UDP"]
+
+    df["proto"] = np.select(conds, choices, default="OTHER")
+
+    # IPs como categóricos: groupby/nunique passam a operar sobre códigos inteiros
+    df["ip.src"] = df["ip.src"].astype("category")
+    df["ip.dst"] = df["ip.dst"].astype("category")
     return df
 
 
@@ -130,54 +261,203 @@ def aggregate_1s(df: pd.DataFrame, label: str, delta: float = 1.0) -> pd.DataFra
     if df.empty:
         return pd.DataFrame(columns=["t_start", f"pps_{label}", f"bps_{label}"])
 
-    t0 = np.floor(df["frame.time_epoch"].min())
-    df = df.copy()
-    df["t_start"] = np.floor((df["frame.time_epoch"] - t0) / delta) * delta
-
-    grp = df.groupby("t_start", observed=True)
-
-    out = pd.DataFrame(
-        {
-            "t_start": grp.size().index.values,
-            f"pps_{label}": grp.size().values,
-            f"bps_{label}": grp["frame.len"].sum().values * 8.0,
-        }
-    )
-
-    # Somar flags TCP se existirem
-    flag_map = {
-        "tcp.flags.syn": "syn",
-        "tcp.flags.ack": "ack",
-        "tcp.flags.reset": "reset",
-        "tcp.flags.rst": "rst",
-        "tcp.flags.fin": "fin",
+    # índice inteiro da janela (t >= t0, então o truncamento equivale ao floor)
+    t_epoch = df["frame.time_epoch"].to_numpy(dtype=np.float64)
+    t0 = np.floor(t_epoch.min())
+    t_bin = ((t_epoch - t0) / delta).astype(np.int64)
+
+    # chave externa: evita copiar df só para acrescentar a coluna da janela
+    grp = df.groupby(t_bin, sort=False, observed=True)
+
+    # Flags TCP (se existirem) somadas no mesmo agg que frame.len
+    flag_map = {col: short for col, short in FLAG_MAP.items() if col in df.columns}
+    agg_dict = {"frame.len": "sum", **{col: "sum" for col in flag_map}}
+    res = grp.agg(agg_dict)
+    sz = grp.size()
+
+    # todas as colunas como arrays NumPy; o DataFrame é montado uma vez no fim
+    bins = sz.index.values
+    pps = sz.values
+    data = {
+        "t_start": bins * delta,
+        f"pps_{label}": pps,
+        f"bps_{label}": res["frame.len"].values * 8.0,
     }
     for col, short in flag_map.items():
-        if col in df.columns:
-            out[f"{short}_{label}"] = grp[col].sum().values
+        # flags são int8; a soma pode continuar int8 se couber -> sempre int64
+        data[f"{short}_{label}"] = res[col].to_numpy(np.int64)
 
     # Diversidade e entropias
-    out[f"n_ip_src_{label}"] = grp["ip.src"].nunique().values
-    out[f"n_ip_dst_{label}"] = grp["ip.dst"].nunique().values
-    out[f"H_ip_src_{label}"] = grp["ip.src"].apply(shannon_entropy).values
-    out[f"H_ip_dst_{label}"] = grp["ip.dst"].apply(shannon_entropy).values
+    # janelas compactadas (só as que têm pacotes); pos alinha com a ordem de bins
+    ub, win = np.unique(t_bin, return_inverse=True)
+    pos = np.searchsorted(ub, bins)
+    n_src, H_src = entropy_by_bin(df, "ip.src", win, len(ub))
+    n_dst, H_dst = entropy_by_bin(df, "ip.dst", win, len(ub))
+    data[f"n_ip_src_{label}"] = n_src[pos]
+    data[f"n_ip_dst_{label}"] = n_dst[pos]
+    data[f"H_ip_src_{label}"] = H_src[pos]
+    data[f"H_ip_dst_{label}"] = H_dst[pos]
 
     # Razões úteis (SYN%)
-    if f"pps_{label}" in out and f"syn_{label}" in out:
-        syn = out[f"syn_{label}"].astype(float)
-        ack = out.get(f"ack_{label}", pd.Series(0, index=out.index)).astype(float)
-        out[f"syn_percent_{label}"] = syn / (out[f"pps_{label}"] + 1e-9)
-        out[f"syn_ack_ratio_{label}"] = syn / (ack + 1e-9)
-
+    if "tcp.flags.syn" in flag_map:
+        syn = res["tcp.flags.syn"].to_numpy(dtype=np.float64)
+        ack = (
+            res["tcp.flags.ack"].to_numpy(dtype=np.float64)
+            if "tcp.flags.ack" in flag_map
+            else 0.0
+        )
+        data[f"syn_percent_{label}"] = syn / (pps + 1e-9)
+        data[f"syn_ack_ratio_{label}"] = syn / (ack + 1e-9)
+
+    out = pd.DataFrame(data)
     return out.sort_values("t_start").reset_index(drop=True)
 
 
+def aggregate_polars(
+    path: str, label: str, delta: float = 1.0, sep: str | None = None
+) -> pd.DataFrame:
+    """Mesma agregação de load_packets + aggregate_1s, feita em Polars (lazy).
+
+    Leitura (scan_csv) e group_by rodam em paralelo no Polars; só o resultado
+    agregado é convertido para pandas. Requer CSV/TSV em UTF-8.
+    """
+    try:
+        import polars as pl
+    except ImportError as e:
+        raise RuntimeError(
+            "--engine polars requer Polars. Instale com: pip install polars"
+        ) from e
+
+    if sep is None:
+        sep = guess_sep(path)
+
+    try:
+        header = [c for c in read_header(path, sep) if is_used_column(c)]
+    except UnicodeDecodeError as e:
+        raise RuntimeError(
+            f"--engine polars requer CSV/TSV em UTF-8 ({path} não é); "
+            "use --engine pandas para UTF-16"
+        ) from e
+    cols = {c.strip() for c in header}
+    for c in ["frame.time_epoch", "ip.src", "ip.dst", "frame.len"]:
+        if c not in cols:
+            raise RuntimeError(f"Coluna ausente em {path}: {c}")
+
+    def to_flag(c: str) -> pl.Expr:
+        if c not in cols:
+            return pl.lit(0, dtype=pl.Int8).alias(c)
+        v = pl.col(c).cast(pl.Float64, strict=False).fill_null(0)
+        return v.cast(pl.Int8)
+
+    t = pl.col("frame.time_epoch")
+    lf = (
+        pl.scan_csv(path, separator=sep, infer_schema=False, null_values=NULL_VALUES)
+        .select(header)
+        .rename({c: c.strip() for c in header})
+        .with_columns(
+            pl.col("frame.time_epoch").cast(pl.Float64, strict=False),
+            pl.col("frame.len").cast(pl.Float64, strict=False),
+            *[to_flag(c) for c in FLAG_COLS],
+        )
+        .drop_nulls(["frame.time_epoch", "frame.len"])
+        .with_columns(((t - t.min().floor()) / delta).cast(pl.Int64).alias("t_bin"))
+    )
+
+    base = lf.group_by("t_bin").agg(
+        pl.len().cast(pl.Int64).alias(f"pps_{label}"),
+        (pl.col("frame.len").sum() * 8.0).alias(f"bps_{label}"),
+        *[
+            pl.col(col).cast(pl.Int64).sum().alias(f"{short}_{label}")
+            for col, short in FLAG_MAP.items()
+        ],
+    )
+
+    # contagens por (janela, ip) -> nº distintos e entropia (bits), sem IP nulo
+    def ip_stats(ip_col: str, short: str) -> pl.LazyFrame:
+        return (
+            lf.drop_nulls(ip_col)
+            .group_by("t_bin", ip_col)
+            .len()
+            .group_by("t_bin")
+            .agg(
+                pl.len().cast(pl.Int64).alias(f"n_{short}_{label}"),
+                pl.col("len").entropy(base=2).alias(f"H_{short}_{label}"),
+            )
+        )
+
+    src = ip_stats("ip.src", "ip_src")
+    dst = ip_stats("ip.dst", "ip_dst")
+    syn = pl.col(f"syn_{label}").cast(pl.Float64)
+    ack = pl.col(f"ack_{label}").cast(pl.Float64)
+    out = (
+        base.join(src, on="t_bin", how="left")
+        .join(dst, on="t_bin", how="left")
+        .with_columns(
+            pl.col(f"n_ip_src_{label}", f"n_ip_dst_{label}").fill_null(0),
+            pl.col(f"H_ip_src_{label}", f"H_ip_dst_{label}").fill_null(0.0),
+            (syn / (pl.col(f"pps_{label}") + 1e-9)).alias(f"syn_percent_{label}"),
+            (syn / (ack + 1e-9)).alias(f"syn_ack_ratio_{label}"),
+            (pl.col("t_bin") * delta).alias("t_start"),
+        )
+        .sort("t_bin")
+        .select(
+            "t_start",
+            f"pps_{label}",
+            f"bps_{label}",
+            *[f"{short}_{label}" for short in FLAG_MAP.values()],
+            f"n_ip_src_{label}",
+            f"n_ip_dst_{label}",
+            f"H_ip_src_{label}",
+            f"H_ip_dst_{label}",
+            f"syn_percent_{label}",
+            f"syn_ack_ratio_{label}",
+        )
+        .collect()
+    )
+    if out.height == 0:
+        raise RuntimeError(f"DataFrame vazio após limpeza em {path}")
+    return out.to_pandas()
+
+
 def outer_join_on_time(dfs: list[pd.DataFrame]) -> pd.DataFrame:
     """Outer-join em t_start para construir série multivariada."""
-    from functools import reduce
-
-    multivar = reduce(lambda l, r: pd.merge(l, r, on="t_start", how="outer"), dfs)
-    return multivar.sort_values("t_start").reset_index(drop=True).fillna(0)
+    # concat num índice comum: uma única união de índices em vez de N-1 merges
+    idxed = [d.set_index("t_start") for d in dfs]
+    multivar = pd.concat(idxed, axis=1, join="outer").sort_index()
+    return multivar.reset_index().fillna(0)
+
+
+def write_agg(df: pd.DataFrame, path_base: str, out_format: str = "csv") -> str:
+    """Grava df em path_base + .csv ou .parquet (zstd); retorna o caminho."""
+    if out_format == "parquet":
+        path = path_base + ".parquet"
+        df.to_parquet(
+            path, engine="pyarrow", compression="zstd", compression_level=3, index=False
+        )
+    else:
+        path = path_base + ".csv"
+        df.to_csv(path, index=False)
+    return path
+
+
+def process_source(
+    label: str,
+    path: str,
+    outname: str,
+    sep: str | None,
+    delta: float,
+    outdir: str,
+    engine: str = "pandas",
+    out_format: str = "csv",
+) -> pd.DataFrame:
+    """Carrega, agrega e grava o arquivo agregado de uma fonte (roda num worker)."""
+    if engine == "polars":
+        agg = aggregate_polars(path, label, delta, sep=sep)
+    else:
+        df = load_packets(path, sep=sep)
+        agg = aggregate_1s(df, label, delta)
+    write_agg(agg, os.path.join(outdir, outname), out_format)
+    return agg
 
 
 def parse_sep_arg(sep_arg: str) -> str | None:
@@ -206,32 +486,49 @@ def main():
         default="auto",
         help="separador global (auto=pelas extensões, tab='\\t', comma=',')",
     )
+    ap.add_argument(
+        "--engine",
+        choices=["pandas", "polars"],
+        default="pandas",
+        help="motor de leitura/agregação (polars: scan_csv + group_by paralelos)",
+    )
+    ap.add_argument(
+        "--out-format",
+        choices=["csv", "parquet"],
+        default="csv",
+        help="formato dos agregados (parquet: colunar, tipado, zstd)",
+    )
     args = ap.parse_args()
 
     os.makedirs(args.outdir, exist_ok=True)
-    parts: list[pd.DataFrame] = []
-
     sep = parse_sep_arg(args.sep)
 
-    if args.http and os.path.isfile(args.http):
-        df_http = load_packets(args.http, sep=sep)
-        agg_http = aggregate_1s(df_http, "http", args.delta)
-        agg_http.to_csv(os.path.join(args.outdir, "http_agg_1s.csv"), index=False)
-        parts.append(agg_http)
-
-    if args.udp and os.path.isfile(args.udp):
-        df_udp = load_packets(args.udp, sep=sep)
-        agg_udp = aggregate_1s(df_udp, "udp", args.delta)
-        agg_udp.to_csv(os.path.join(args.outdir, "udp_agg_1s.csv"), index=False)
-        parts.append(agg_udp)
-
-    if not parts:
+    jobs = [
+        (label, path, outname)
+        for label, path, outname in [
+            ("http", args.http, "http_agg_1s"),
+            ("udp", args.udp, "udp_agg_1s"),
+        ]
+        if path and os.path.isfile(path)
+    ]
+    if not jobs:
         raise SystemExit("Nenhuma fonte fornecida (--http/--udp).")
 
+    opts = (sep, args.delta, args.outdir, args.engine, args.out_format)
+    if len(jobs) == 1:
+        # uma fonte só: sem ganho em subir um worker e serializar o resultado
+        parts = [process_source(*jobs[0], *opts)]
+    else:
+        # cada arquivo é independente: leitura + agregação em processos separados
+        with ProcessPoolExecutor(max_workers=len(jobs)) as ex:
+            futures = [ex.submit(process_source, *job, *opts) for job in jobs]
+            # mantém a ordem http, udp nas colunas da série multivariada
+            parts = [f.result() for f in futures]
+
     multivar = outer_join_on_time(parts)
     os.makedirs("data", exist_ok=True)
-    multivar.to_csv(os.path.join("data", "multivar_agg_1s.csv"), index=False)
-    print("OK: data/multivar_agg_1s.csv, data/agg/* gerados.")
+    out = write_agg(multivar, os.path.join("data", "multivar_agg_1s"), args.out_format)
+    print(f"OK: {out}, {args.outdir}/* gerados.")
 
 
 if __name__ == "__main__":
@@ -8,50 +8,124 @@ import argparse
 import os
 import numpy as np
 import pandas as pd
+import matplotlib
+
+matplotlib.use("Agg")  # só gera PNGs: evita inicializar backend de GUI
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+
+try:
+    from numba import njit
+except ImportError:  # opcional: sem numba, o z-score usa pandas rolling
+    njit = None
 
 try:
+    from scipy import fft as sp_fft
     from scipy import signal as sig
 except Exception as e:
     raise RuntimeError(
         "Este script requer SciPy (scipy.signal). Instale com: pip install scipy"
     ) from e
 
+try:
+    # opcional: FFTs do Welch/STFT via FFTW, com cache dos planos por (tamanho, dtype)
+    import pyfftw
+
+    sp_fft.set_global_backend(pyfftw.interfaces.scipy_fft)
+    pyfftw.interfaces.cache.enable()
+    # set_workers(-1) não chega ao FFTW (scipy.signal chama rfft sem workers):
+    # as threads vêm do padrão global do pyfftw (1, salvo PYFFTW_NUM_THREADS)
+    if "PYFFTW_NUM_THREADS" not in os.environ:
+        pyfftw.config.NUM_THREADS = os.cpu_count() or 1
+except (ImportError, AttributeError):
+    pass
+
+
+# PNG via Pillow com compressão zlib leve (figuras grandes salvam bem mais rápido)
+PNG_KWARGS = {"compress_level": 1}
+
 
 # ----------------------------
 # utilitários de PDS
 # ----------------------------
+def _rolling_mean_std(x: np.ndarray, win: int, minp: int) -> tuple[np.ndarray, np.ndarray]:
+    """Média e desvio (ddof=0) rolantes numa passada (Welford); NaN se < minp."""
+    n = x.shape[0]
+    mu = np.full(n, np.nan)
+    sd = np.full(n, np.nan)
+    k = 0
+    mean = 0.0
+    m2 = 0.0
+    m2_peak = 0.0
+    run = 0
+    for i in range(n):
+        v = x[i]
+        run = run + 1 if i > 0 and v == x[i - 1] else 1
+        k += 1
+        d = v - mean
+        mean += d / k
+        m2 += d * (v - mean)
+        if i >= win:
+            old = x[i - win]
+            k -= 1
+            d = old - mean
+            mean -= d / k
+            m2 -= d * (old - mean)
+            if m2 < 1e-4 * m2_peak:
+                # saiu um burst: o cancelamento deixa erro ~ m2_peak * eps em
+                # m2, maior que a variância que sobrou -> recalcula exato
+                w = x[i - win + 1 : i + 1]
+                mean = w.mean()
+                m2 = ((w - mean) ** 2).sum()
+                m2_peak = m2
+        m2_peak = max(m2_peak, m2)
+        if run >= k:
+            # janela constante: estado exato (x[i], 0), como no pandas
+            mean = v
+            m2 = 0.0
+        if k >= minp:
+            mu[i] = mean
+            sd[i] = np.sqrt(max(m2 / k, 0.0))
+    return mu, sd
+
+
+if njit is not None:
+    _rolling_mean_std = njit(cache=True)(_rolling_mean_std)
+
+
 def moving_zscore(x: np.ndarray, win: int = 21, eps: float = 1e-9) -> np.ndarray:
     """z-score móvel (média e desvio rolantes). win deve ser ímpar."""
-    s = pd.Series(x.astype(float))
+    x = np.asarray(x, dtype=np.float64)
     minp = max(3, win // 3)
-    mu = s.rolling(win, min_periods=minp, center=False).mean()
-    sd = s.rolling(win, min_periods=minp, center=False).std(ddof=0)
-    z = (s - mu) / (sd + eps)
+    if njit is not None:
+        mu, sd = _rolling_mean_std(x, win, minp)
+    else:
+        s = pd.Series(x)
+        mu = s.rolling(win, min_periods=minp, center=False).mean().to_numpy()
+        sd = s.rolling(win, min_periods=minp, center=False).std(ddof=0).to_numpy()
+    z = (x - mu) / (sd + eps)
     # fallback para o início da série
-    head = min(win, len(s))
+    head = min(win, len(x))
     if head > 1:
-        z.iloc[:head] = (s.iloc[:head] - s.iloc[:head].mean()) / (
-            s.iloc[:head].std(ddof=0) + eps
-        )
-    return z.fillna(0.0).to_numpy()
+        z[:head] = (x[:head] - x[:head].mean()) / (x[:head].std() + eps)
+    return np.where(np.isnan(z), 0.0, z)
 
 def plot_zscore(z, out_path):
    
     t = np.arange(len(z))  # 0,1,2,... (como Δt = 1s, isso já é o tempo em segundos)
 
-    plt.figure(figsize=(12, 5))
-    plt.plot(t, z, marker="o", linestyle="-")
-    plt.axhline(0, linestyle=":", linewidth=1)
-    plt.axhline(3, linestyle="--", linewidth=1)
-    plt.axhline(-3, linestyle="--", linewidth=1)
-    plt.xlabel("tempo (s)")
-    plt.ylabel("z-score")
-    plt.title("Série após detrend / z-score")
-    plt.grid(True, linestyle=":", linewidth=0.5)
-    plt.tight_layout()
-    plt.savefig(out_path, dpi=160)
-    plt.close()
+    fig, ax = plt.subplots(figsize=(12, 5))
+    ax.plot(t, z, marker="o", linestyle="-")
+    ax.axhline(0, linestyle=":", linewidth=1)
+    ax.axhline(3, linestyle="--", linewidth=1)
+    ax.axhline(-3, linestyle="--", linewidth=1)
+    ax.set_xlabel("tempo (s)")
+    ax.set_ylabel("z-score")
+    ax.set_title("Série após detrend / z-score")
+    ax.grid(True, linestyle=":", linewidth=0.5)
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=160, pil_kwargs=PNG_KWARGS)
+    plt.close(fig)
 
 
 
@@ -77,16 +151,17 @@ def welch_psd(x, fs=1.0, nperseg=128, noverlap=96, detrend="constant"):
         if noverlap >= nperseg:
             noverlap = nperseg - 1
 
-    f, Pxx = sig.welch(
-        x,
-        fs=fs,
-        window="hann",
-        nperseg=nperseg,
-        noverlap=noverlap,
-        detrend=detrend,
-        scaling="density",
-        average="mean",
-    )
+    with sp_fft.set_workers(-1):
+        f, Pxx = sig.welch(
+            x,
+            fs=fs,
+            window="hann",
+            nperseg=nperseg,
+            noverlap=noverlap,
+            detrend=detrend,
+            scaling="density",
+            average="mean",
+        )
     return f, Pxx
 
 
@@ -104,16 +179,17 @@ def stft_power(x, fs=1.0, nperseg=32, noverlap=24, detrend="constant"):
         if noverlap >= nperseg:
             noverlap = nperseg - 1
 
-    f, t, Zxx = sig.stft(
-        x,
-        fs=fs,
-        window="hann",
-        nperseg=nperseg,
-        noverlap=noverlap,
-        detrend=detrend,
-        boundary=None,
-        padded=False,
-    )
+    with sp_fft.set_workers(-1):
+        f, t, Zxx = sig.stft(
+            x,
+            fs=fs,
+            window="hann",
+            nperseg=nperseg,
+            noverlap=noverlap,
+            detrend=detrend,
+            boundary=None,
+            padded=False,
+        )
     Sxx = np.abs(Zxx) ** 2
     return f, t, Sxx
 
@@ -127,19 +203,14 @@ def acf_normalized(x: np.ndarray, max_lag: int | None = None) -> tuple[np.ndarra
     n = len(x)
     if max_lag is None or max_lag >= n:
         max_lag = n - 1
-    # correlação completa
-    corr = sig.correlate(x, x, mode="full")
-    lags = np.arange(-n + 1, n)
-    # pega apenas lags >= 0
-    mask = lags >= 0
-    corr = corr[mask]
-    lags = lags[mask]
+    # autocorrelação via FFT (zero-padding >= 2n-1 evita aliasing circular)
+    m = 1 << (2 * n - 1).bit_length()
+    X = np.fft.rfft(x, n=m)
+    corr = np.fft.irfft(X * np.conj(X), n=m)[: max_lag + 1]
+    lags = np.arange(max_lag + 1)
     # normalizar por valor em lag 0
     if corr[0] != 0:
         corr = corr / corr[0]
-    # cortar em max_lag
-    lags = lags[: max_lag + 1]
-    corr = corr[: max_lag + 1]
     return lags, corr
 
 
@@ -147,59 +218,91 @@ def acf_normalized(x: np.ndarray, max_lag: int | None = None) -> tuple[np.ndarra
 # I/O e plots
 # ----------------------------
 def load_series(csv_path: str, col: str) -> np.ndarray:
-    df = pd.read_csv(csv_path)
-    if col not in df.columns:
+    is_parquet = csv_path.lower().endswith(".parquet")
+    # só o cabeçalho/schema para validar; depois lê apenas a coluna pedida
+    if is_parquet:
+        import pyarrow.parquet as pq
+
+        columns = pq.read_schema(csv_path).names
+    else:
+        columns = list(pd.read_csv(csv_path, nrows=0).columns)
+    if col not in columns:
         raise ValueError(
             f"Coluna '{col}' não encontrada em {csv_path}. "
-            f"Colunas disponíveis: {list(df.columns)}"
+            f"Colunas disponíveis: {columns}"
+        )
+    if is_parquet:
+        df = pd.read_parquet(csv_path, columns=[col])
+        return df[col].to_numpy(dtype=float, copy=True)
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pac
+    except ImportError:
+        df = pd.read_csv(csv_path, usecols=[col], dtype={col: np.float64})
+        return df[col].to_numpy()
+
+    with pa.memory_map(csv_path) as src:
+        tab = pac.read_csv(
+            src,
+            convert_options=pac.ConvertOptions(
+                include_columns=[col], column_types={col: pa.float64()}
+            ),
         )
-    return df[col].to_numpy(dtype=float)
+    # cópia gravável, como o to_numpy do pandas (o buffer do Arrow é só leitura)
+    return tab.column(col).to_numpy().copy()
 
 
 def plot_series(t, x, x_proc, out_path: str, use_z: bool):
-    plt.figure(figsize=(12, 4))
-    plt.plot(t, x, label="série original")
+    fig, ax = plt.subplots(figsize=(12, 4))
+    ax.plot(t, x, label="série original")
     if use_z:
-        plt.plot(t, x_proc, linestyle="--", label="pós detrend/z-score")
-    plt.xlabel("tempo (s)")
-    plt.ylabel("amplitude")
-    plt.title("Série temporal")
-    plt.grid(True, linestyle=":")
+        ax.plot(t, x_proc, linestyle="--", label="pós detrend/z-score")
+    ax.set_xlabel("tempo (s)")
+    ax.set_ylabel("amplitude")
+    ax.set_title("Série temporal")
+    ax.grid(True, linestyle=":")
     if use_z:
-        plt.legend()
-    plt.tight_layout()
-    plt.savefig(out_path, dpi=160)
-    plt.close()
+        ax.legend()
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=160, pil_kwargs=PNG_KWARGS)
+    plt.close(fig)
 
 
 def plot_acf(lags, corr, out_path: str):
-    plt.figure(figsize=(12, 4))
-    # compatível com versões antigas e novas do matplotlib
-    try:
-        plt.stem(lags, corr, use_line_collection=True)
-    except TypeError:
-        # versões antigas não aceitam use_line_collection
-        plt.stem(lags, corr)
-    plt.xlabel("lag (s)")
-    plt.ylabel("ACF normalizada")
-    plt.title("Autocorrelação (ACF)")
-    plt.grid(True, linestyle=":")
-    plt.tight_layout()
-    plt.savefig(out_path, dpi=160)
-    plt.close()
+    lags = np.asarray(lags, dtype=float)
+    corr = np.asarray(corr, dtype=float)
+    fig, ax = plt.subplots(figsize=(12, 4))
+    # "stem" com um único LineCollection (hastes) + um scatter (marcadores),
+    # em vez de um Line2D por lag
+    segs = np.stack(
+        [np.column_stack([lags, np.zeros_like(corr)]), np.column_stack([lags, corr])],
+        axis=1,
+    )
+    ax.add_collection(LineCollection(segs, linewidths=1))
+    ax.scatter(lags, corr, s=12, zorder=3)
+    ax.axhline(0, color="C3", linewidth=1)
+    ax.set_xlim(lags.min() - 0.5, lags.max() + 0.5)
+    ax.set_ylim(min(0.0, corr.min()) * 1.1 - 0.05, 1.05)
+    ax.set_xlabel("lag (s)")
+    ax.set_ylabel("ACF normalizada")
+    ax.set_title("Autocorrelação (ACF)")
+    ax.grid(True, linestyle=":")
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=160, pil_kwargs=PNG_KWARGS)
+    plt.close(fig)
 
 
 
 def plot_psd(f, Pxx, out_path: str):
-    plt.figure(figsize=(12, 4))
-    plt.semilogy(f, Pxx)
-    plt.xlabel("frequência (Hz)")
-    plt.ylabel("PSD")
-    plt.title("Welch/PSD")
-    plt.grid(True, which="both", linestyle=":")
-    plt.tight_layout()
-    plt.savefig(out_path, dpi=160)
-    plt.close()
+    fig, ax = plt.subplots(figsize=(12, 4))
+    ax.semilogy(f, Pxx)
+    ax.set_xlabel("frequência (Hz)")
+    ax.set_ylabel("PSD")
+    ax.set_title("Welch/PSD")
+    ax.grid(True, which="both", linestyle=":")
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=160, pil_kwargs=PNG_KWARGS)
+    plt.close(fig)
 
 
 def plot_stft(f, t, Sxx, out_path: str):
@@ -209,14 +312,14 @@ def plot_stft(f, t, Sxx, out_path: str):
     if vmin == vmax:
         vmin = None
         vmax = None
-    plt.figure(figsize=(12, 4))
+    fig, ax = plt.subplots(figsize=(12, 4))
     extent = [
         t[0] if len(t) else 0,
         t[-1] if len(t) else 0,
         f[0] if len(f) else 0,
         f[-1] if len(f) else 0,
     ]
-    plt.imshow(
+    im = ax.imshow(
         Sxx,
         origin="lower",
         aspect="auto",
@@ -224,13 +327,13 @@ def plot_stft(f, t, Sxx, out_path: str):
         vmin=vmin,
         vmax=vmax,
     )
-    plt.colorbar(label="potência")
-    plt.xlabel("tempo (s)")
-    plt.ylabel("frequência (Hz)")
-    plt.title("Espectrograma (STFT)")
-    plt.tight_layout()
-    plt.savefig(out_path, dpi=160)
-    plt.close()
+    fig.colorbar(im, ax=ax, label="potência")
+    ax.set_xlabel("tempo (s)")
+    ax.set_ylabel("frequência (Hz)")
+    ax.set_title("Espectrograma (STFT)")
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=160, pil_kwargs=PNG_KWARGS)
+    plt.close(fig)
 
 
 def main():
@@ -240,7 +343,7 @@ def main():
     ap.add_argument(
         "--csv",
         default="data/multivar_agg_1s.csv",
-        help="Caminho do CSV agregado.",
+        help="Caminho do CSV (ou .parquet) agregado.",
     )
     ap.add_argument(
         "--col",
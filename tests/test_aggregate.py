@@ -0,0 +1,43 @@
+# Regressão: as agregações (pandas e Polars) devem reproduzir os agregados
+# versionados a partir dos CSVs de pacotes correspondentes. tests/data/mixed_*
+# (gerado com o aggregate.py original) tem flags numéricas e True/False sob
+# cabeçalho com espaço, IPs vazios, ip.proto, janelas vazias e linhas fora
+# de ordem.
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+import aggregate as agg  # noqa: E402
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+CASES = [
+    (
+        os.path.join(ROOT, "data", "csv", "http_packets.csv"),
+        os.path.join(ROOT, "data", "agg", "http_agg_1s.csv"),
+        "http",
+    ),
+    (
+        os.path.join(DATA, "mixed_packets.csv"),
+        os.path.join(DATA, "mixed_agg_1s.csv"),
+        "mix",
+    ),
+]
+
+
+def check(out, golden):
+    pd.testing.assert_frame_equal(out, pd.read_csv(golden), check_exact=False)
+
+
+@pytest.mark.parametrize("packets,golden,label", CASES)
+def test_aggregate_1s_matches_golden(packets, golden, label):
+    check(agg.aggregate_1s(agg.load_packets(packets), label), golden)
+
+
+@pytest.mark.parametrize("packets,golden,label", CASES)
+def test_aggregate_polars_matches_golden(packets, golden, label):
+    pytest.importorskip("polars")
+    check(agg.aggregate_polars(packets, label), golden)
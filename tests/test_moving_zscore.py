@@ -0,0 +1,61 @@
+# Regressão: o rolling de make_figs_ddos deve bater com pd.Series.rolling,
+# inclusive em trechos constantes (z = 0, sem resíduo de arredondamento).
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+import make_figs_ddos as figs  # noqa: E402
+
+
+def pandas_zscore(x, win=21, eps=1e-9):
+    s = pd.Series(x, dtype=float)
+    minp = max(3, win // 3)
+    mu = s.rolling(win, min_periods=minp).mean().to_numpy()
+    sd = s.rolling(win, min_periods=minp).std(ddof=0).to_numpy()
+    z = (x - mu) / (sd + eps)
+    head = min(win, len(x))
+    if head > 1:
+        z[:head] = (x[:head] - x[:head].mean()) / (x[:head].std() + eps)
+    return np.where(np.isnan(z), 0.0, z)
+
+
+def check(x, win=21):
+    x = np.asarray(x, dtype=float)
+    minp = max(3, win // 3)
+    mu, sd = figs._rolling_mean_std(x, win, minp)
+    s = pd.Series(x)
+    np.testing.assert_allclose(mu, s.rolling(win, min_periods=minp).mean(), atol=1e-6)
+    np.testing.assert_allclose(
+        sd, s.rolling(win, min_periods=minp).std(ddof=0), atol=1e-6
+    )
+    np.testing.assert_allclose(
+        figs.moving_zscore(x, win), pandas_zscore(x, win), atol=1e-6
+    )
+
+
+def test_constant_tail():
+    rng = np.random.default_rng(0)
+    # rampa ruidosa seguida de enlace saturado (valor constante, como bps_udp)
+    x = np.r_[rng.normal(1.2e6, 2e5, 60), np.full(80, 1879888.0)] - 1.5e6
+    check(x)
+    assert np.all(figs.moving_zscore(x)[-50:] == 0.0)
+
+
+def test_burst_then_zeros():
+    x = np.r_[np.zeros(30), np.full(10, 3.3e7), np.zeros(60)]
+    check(x)
+    assert np.all(figs.moving_zscore(x)[-30:] == 0.0)
+
+
+def test_burst_then_quiet():
+    rng = np.random.default_rng(1)
+    # burst de ~1e8 seguido de tráfego baixo e ruidoso: m2 não pode guardar
+    # o erro de cancelamento do burst depois que ele sai da janela
+    x = np.r_[rng.normal(1e8, 1e6, 50), rng.normal(1.0, 0.1, 100)]
+    check(x)
+    _, sd = figs._rolling_mean_std(x, 21, 7)
+    exact = np.lib.stride_tricks.sliding_window_view(x, 21).std(axis=1)
+    np.testing.assert_allclose(sd[20:], exact, rtol=1e-9)